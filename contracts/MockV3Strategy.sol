@@ -6,26 +6,60 @@ import {BaseStrategy} from "@tokenized-strategy/BaseStrategy.sol";
 import {ERC20} from "@openzeppelin/contracts/token/ERC20/ERC20.sol";
 import {SafeERC20} from "@openzeppelin/contracts/token/ERC20/utils/SafeERC20.sol";
 
+// Holds the deployed funds so withdraws have to go through `_freeFunds`.
+contract MockYieldSource {
+    constructor(address _asset) {
+        ERC20(_asset).approve(msg.sender, type(uint256).max);
+    }
+}
+
 contract MockV3Strategy is BaseStrategy {
     using SafeERC20 for ERC20;
 
+    address public immutable yieldSource;
+
     uint256 public withdrawable = type(uint256).max;
 
+    // Amount of `asset` to lose on the next report.
+    uint256 public lossToSimulate;
+
+    // Basis points of the freed amount lost on every withdraw.
+    uint256 public withdrawLoss;
+
     constructor(
         address _asset,
         string memory _name
-    ) BaseStrategy(_asset, _name) {}
+    ) BaseStrategy(_asset, _name) {
+        yieldSource = address(new MockYieldSource(_asset));
+    }
 
-    function _deployFunds(uint256 _amount) internal override {}
+    function _deployFunds(uint256 _amount) internal override {
+        asset.safeTransfer(yieldSource, _amount);
+    }
 
-    function _freeFunds(uint256 _amount) internal override {}
+    function _freeFunds(uint256 _amount) internal override {
+        uint256 _lost = (_amount * withdrawLoss) / 10_000;
+        if (_lost > 0) {
+            asset.safeTransferFrom(yieldSource, address(0xdead), _lost);
+        }
+
+        asset.safeTransferFrom(yieldSource, address(this), _amount - _lost);
+    }
 
     function _harvestAndReport()
         internal
         override
         returns (uint256 _totalAssets)
     {
-        _totalAssets = asset.balanceOf(address(this));
+        uint256 _loss = lossToSimulate;
+        if (_loss > 0) {
+            lossToSimulate = 0;
+            asset.safeTransferFrom(yieldSource, address(0xdead), _loss);
+        }
+
+        _totalAssets =
+            asset.balanceOf(address(this)) +
+            asset.balanceOf(yieldSource);
     }
 
     function availableWithdrawLimit(
@@ -37,4 +71,13 @@ contract MockV3Strategy is BaseStrategy {
     function setWithdrawable(uint256 _withdrawable) external {
         withdrawable = _withdrawable;
     }
+
+    function setLoss(uint256 _loss) external {
+        lossToSimulate = _loss;
+    }
+
+    function setWithdrawLoss(uint256 _withdrawLoss) external {
+        require(_withdrawLoss <= 10_000, "too high");
+        withdrawLoss = _withdrawLoss;
+    }
 }
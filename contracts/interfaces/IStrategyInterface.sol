@@ -4,5 +4,11 @@ pragma solidity 0.8.18;
 import {IStrategy} from "@tokenized-strategy/interfaces/IStrategy.sol";
 
 interface IStrategyInterface is IStrategy {
+    function yieldSource() external view returns (address);
+
     function setWithdrawable(uint256 _withdrawable) external;
+
+    function setLoss(uint256 _loss) external;
+
+    function setWithdrawLoss(uint256 _withdrawLoss) external;
 }
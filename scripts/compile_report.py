@@ -0,0 +1,171 @@
+import hashlib
+import json
+import re
+import subprocess
+import time
+from pathlib import Path
+
+import click
+from ape import project
+
+# EIP-170 limit on deployed bytecode.
+CONTRACT_SIZE_LIMIT = 24_576
+# Warn once a contract gets this close to the limit.
+SIZE_WARNING_RATIO = 0.9
+
+REPORT_PATH = Path(".build") / "compile_report.json"
+# Bumped when the report layout changes so old reports are discarded.
+REPORT_VERSION = 2
+# Number of runs kept to compare sizes against.
+MAX_HISTORY = 100
+# Settings and pinned dependency refs that every contract is compiled against.
+CONFIG_PATH = Path("ape-config.yaml")
+
+IMPORT_PATTERN = re.compile(r'import\s+(?:{[^}]*}\s+from\s+)?"(\.[^"]+)"')
+
+
+def _local_imports(source):
+    """All relative imports of `source`, followed transitively."""
+    seen = set()
+    queue = [source]
+    while queue:
+        path = queue.pop()
+        for match in IMPORT_PATTERN.findall(path.read_text()):
+            imported = (path.parent / match).resolve()
+            if imported not in seen:
+                seen.add(imported)
+                queue.append(imported)
+    return sorted(seen)
+
+
+def source_hash(source, config_hash):
+    digest = hashlib.sha256(config_hash.encode())
+    for path in [source, *_local_imports(source)]:
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def _bytecode_size(bytecode):
+    if bytecode is None or not bytecode.bytecode:
+        return 0
+    return (len(bytecode.bytecode) - 2) // 2
+
+
+def _from_source(contract_type, source):
+    source_id = Path(contract_type.source_id or "")
+    return source.resolve() in (
+        (project.path / source_id).resolve(),
+        (project.contracts_folder / source_id).resolve(),
+    )
+
+
+def _commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_report():
+    if REPORT_PATH.is_file():
+        report = json.loads(REPORT_PATH.read_text())
+        if report.get("version") == REPORT_VERSION:
+            return report
+    return {"version": REPORT_VERSION, "sources": {}, "history": []}
+
+
+def compile_changed(report, force=False):
+    """
+    Compile every source whose own hash, local imports or config changed.
+
+    Sources go through ape's own project compile one at a time, so the
+    artifacts land in `.build` and later `ape compile` / `ape test` runs
+    reuse them instead of compiling again.
+
+    Returns `{contract_name: {size, initcode_size, source_compile_time}}`
+    for all contracts, reusing the previous results for unchanged sources.
+    `source_compile_time` is the time to compile the whole source file the
+    contract lives in, including its imports, so contracts sharing a file
+    report the same value.
+    """
+    config_hash = hashlib.sha256(CONFIG_PATH.read_bytes()).hexdigest()
+    # Rebuilt from scratch so deleted sources drop out of the report.
+    sources = {}
+    contracts = {}
+
+    for source in sorted(project.contracts_folder.rglob("*.sol")):
+        key = str(source.relative_to(project.contracts_folder))
+        checksum = source_hash(source, config_hash)
+        cached = report["sources"].get(key)
+
+        if not force and cached is not None and cached["hash"] == checksum:
+            sources[key] = cached
+            contracts.update(cached["contracts"])
+            continue
+
+        start = time.perf_counter()
+        containers = project.load_contracts(source, use_cache=False)
+        compile_time = time.perf_counter() - start
+
+        compiled = {}
+        for container in containers.values():
+            contract_type = container.contract_type
+            if not _from_source(contract_type, source):
+                continue
+            size = _bytecode_size(contract_type.runtime_bytecode)
+            # Interfaces and libraries without code are not worth tracking.
+            if size == 0:
+                continue
+            compiled[contract_type.name] = {
+                "size": size,
+                "initcode_size": _bytecode_size(contract_type.deployment_bytecode),
+                "source_compile_time": round(compile_time, 3),
+            }
+        click.echo(f"Compiled {key} in {compile_time:.2f}s")
+
+        sources[key] = {"hash": checksum, "contracts": compiled}
+        contracts.update(compiled)
+
+    report["sources"] = sources
+    return contracts
+
+
+def print_report(contracts, previous):
+    click.echo(
+        f"{'Contract':<24}{'Size':>10}{'Change':>10}{'Limit':>8}{'Source time':>13}"
+    )
+    for name, info in sorted(contracts.items()):
+        size = info["size"]
+        change = size - previous.get(name, {}).get("size", size)
+        click.echo(
+            f"{name:<24}{size:>10}{change:>+10}"
+            f"{size / CONTRACT_SIZE_LIMIT:>8.1%}{info['source_compile_time']:>12.2f}s"
+        )
+
+    for name, info in sorted(contracts.items()):
+        if info["size"] > CONTRACT_SIZE_LIMIT:
+            raise click.ClickException(
+                f"{name} is {info['size']} bytes, over the size limit"
+            )
+        elif info["size"] > CONTRACT_SIZE_LIMIT * SIZE_WARNING_RATIO:
+            click.echo(f"WARNING: {name} is close to the contract size limit")
+
+
+@click.command()
+@click.option("--force", is_flag=True, help="Recompile every contract.")
+def cli(force):
+    report = load_report()
+    previous = report["history"][-1]["contracts"] if report["history"] else {}
+
+    contracts = compile_changed(report, force=force)
+    report["history"].append(
+        {"commit": _commit(), "timestamp": int(time.time()), "contracts": contracts}
+    )
+    report["history"] = report["history"][-MAX_HISTORY:]
+
+    REPORT_PATH.parent.mkdir(parents=True, exist_ok=True)
+    REPORT_PATH.write_text(json.dumps(report, indent=2))
+
+    print_report(contracts, previous)
@@ -0,0 +1,263 @@
+import hashlib
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import click
+from ape import chain, project
+from ape.api.networks import LOCAL_NETWORK_NAME
+from ape.cli import ConnectedProviderCommand
+from ape.exceptions import ContractLogicError
+from ape_ethereum import multicall
+
+from scripts.share_price import SharePriceModel, remember
+
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+# V2 vaults cap the withdrawal queue at 20 strategies.
+MAXIMUM_STRATEGIES = 20
+
+CACHE_PATH = Path(".build") / "health_report"
+CACHE_TTL = 60
+MAX_WORKERS = 16
+# Same address on every chain it is deployed to.
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+
+
+def _has_multicall():
+    """Whether Multicall3 can be used, deploying it first on a local chain."""
+    if chain.provider.get_code(MULTICALL3_ADDRESS):
+        return True
+    if chain.provider.network.name == LOCAL_NETWORK_NAME:
+        multicall.Call.inject()
+        return True
+    return False
+
+
+def _batch(*calls, block_id, use_multicall=True, allow_failure=False):
+    """
+    Run `(method, *args)` calls at `block_id`, failed calls give None.
+
+    Everything goes out as one multicall, or as plain calls one by one on
+    networks without Multicall3.
+    """
+    if use_multicall:
+        call = multicall.Call()
+        for method, *args in calls:
+            call.add(method, *args, allowFailure=allow_failure)
+        return list(call(block_id=block_id))
+
+    results = []
+    for method, *args in calls:
+        try:
+            results.append(method(*args, block_id=block_id))
+        except ContractLogicError:
+            if not allow_failure:
+                raise
+            results.append(None)
+    return results
+
+
+def find_routers(vault, **batch_kwargs):
+    """All strategies of `vault` that are V3Routers, with their V3 vault."""
+    queue = _batch(
+        *[(vault.withdrawalQueue, i) for i in range(MAXIMUM_STRATEGIES)],
+        **batch_kwargs,
+    )
+    queue = queue[: queue.index(ZERO_ADDRESS)] if ZERO_ADDRESS in queue else queue
+
+    if not queue:
+        return []
+
+    candidates = [project.V3Router.at(address) for address in queue]
+    # Strategies that are not routers revert on `v3Vault`.
+    v3_vaults = _batch(
+        *[(router.v3Vault,) for router in candidates],
+        allow_failure=True,
+        **batch_kwargs,
+    )
+    return [
+        (router, project.IVault.at(v3_vault))
+        for router, v3_vault in zip(candidates, v3_vaults)
+        if v3_vault is not None
+    ]
+
+
+def router_health(vault, router, v3_vault, model, now, **batch_kwargs):
+    (
+        params,
+        name,
+        estimated_total_assets,
+        idle_want,
+        max_loss,
+        shares,
+        max_redeem,
+        decimals,
+    ) = _batch(
+        (vault.strategies, router),
+        (router.name,),
+        (router.estimatedTotalAssets,),
+        (router.balanceOfWant,),
+        (router.maxLoss,),
+        (v3_vault.balanceOf, router),
+        (v3_vault.maxRedeem, router),
+        (v3_vault.decimals,),
+        **batch_kwargs,
+    )
+
+    if model is not None:
+        max_redeem = model.convert_to_assets(max_redeem, now)
+        unlocked = model.convert_to_assets(
+            shares, max(model.full_profit_unlock_date, now)
+        )
+        unlocking_profit = unlocked - model.convert_to_assets(shares, now)
+    else:
+        # No model for this vault, value shares on chain and skip unlocking.
+        max_redeem = v3_vault.convertToAssets(
+            max_redeem, block_id=batch_kwargs["block_id"]
+        )
+        unlocking_profit = None
+
+    return {
+        "vault": vault.address,
+        "router": router.address,
+        "name": name,
+        "v3_vault": v3_vault.address,
+        "decimals": decimals,
+        "debt": params.totalDebt,
+        "estimated_total_assets": estimated_total_assets,
+        "idle_want": idle_want,
+        "max_redeem": max_redeem,
+        "max_loss": max_loss,
+        "last_harvest_age": now - params.lastReport,
+        "unrealised_profit": estimated_total_assets - params.totalDebt,
+        # Profit still unlocking in the V3 vault on top of the current value.
+        "unlocking_profit": unlocking_profit,
+    }
+
+
+def _share_price_model(v3_vault, timestamp, **batch_kwargs):
+    """Snapshot `v3_vault` in one batch at the report's block."""
+    values = _batch(*SharePriceModel.snapshot_calls(v3_vault), **batch_kwargs)
+    try:
+        return remember(
+            SharePriceModel.from_values(v3_vault.address, timestamp, values)
+        )
+    except ValueError as error:
+        # One odd vault should not take the whole report down.
+        click.echo(f"WARNING: {error}", err=True)
+        return None
+
+
+def fetch_fleet(vaults, max_workers=MAX_WORKERS):
+    """Health of every V3Router attached to the given V2 vaults."""
+    vaults = [project.dependencies["yearnv2"]["v0.4.6"].Vault.at(v) for v in vaults]
+    # Every read is pinned to one block so harvest ages, share price models
+    # and router balances all describe the same moment.
+    block = chain.blocks.head
+    now = block.timestamp
+    batch_kwargs = {"block_id": block.number, "use_multicall": _has_multicall()}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        found = list(
+            executor.map(lambda vault: find_routers(vault, **batch_kwargs), vaults)
+        )
+
+        # Build each V3 vault's share price model once before fanning out.
+        v3_vaults = {v3.address: v3 for routers in found for _, v3 in routers}
+        models = dict(
+            zip(
+                v3_vaults,
+                executor.map(
+                    lambda v3: _share_price_model(v3, now, **batch_kwargs),
+                    v3_vaults.values(),
+                ),
+            )
+        )
+
+        futures = [
+            executor.submit(
+                router_health,
+                vault,
+                router,
+                v3_vault,
+                models[v3_vault.address],
+                now,
+                **batch_kwargs,
+            )
+            for vault, routers in zip(vaults, found)
+            for router, v3_vault in routers
+        ]
+        return [future.result() for future in futures]
+
+
+def _cache_file(vaults):
+    # Forks share the chain id of the network they fork, so key on both.
+    network = f"{chain.chain_id}:{chain.provider.network.name}"
+    key = f"{network}:{','.join(sorted(v.lower() for v in vaults))}"
+    return CACHE_PATH / f"{hashlib.sha256(key.encode()).hexdigest()[:16]}.json"
+
+
+def load_fleet(vaults, ttl=CACHE_TTL, refresh=False):
+    """`fetch_fleet` behind an on-disk cache that expires after `ttl` seconds."""
+    path = _cache_file(vaults)
+    if not refresh and path.is_file():
+        cached = json.loads(path.read_text())
+        if time.time() - cached["fetched_at"] < ttl:
+            return cached["routers"]
+
+    routers = fetch_fleet(vaults)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({"fetched_at": time.time(), "routers": routers}))
+    return routers
+
+
+def _amount(value, decimals):
+    if value is None:
+        return "-"
+    return f"{value / 10**decimals:,.4f}"
+
+
+def print_report(routers):
+    columns = [
+        ("Router", 44),
+        ("Debt", 16),
+        ("Est. assets", 16),
+        ("Idle want", 14),
+        ("Max redeem", 16),
+        ("Unrealised", 14),
+        ("Unlocking", 14),
+        ("Max loss", 10),
+        ("Harvest age", 13),
+    ]
+    click.echo("".join(f"{name:>{width}}" for name, width in columns))
+
+    for info in routers:
+        decimals = info["decimals"]
+        row = [
+            info["router"],
+            _amount(info["debt"], decimals),
+            _amount(info["estimated_total_assets"], decimals),
+            _amount(info["idle_want"], decimals),
+            _amount(info["max_redeem"], decimals),
+            _amount(info["unrealised_profit"], decimals),
+            _amount(info["unlocking_profit"], decimals),
+            f"{info['max_loss']} bps",
+            f"{info['last_harvest_age'] / 3600:.1f}h",
+        ]
+        click.echo(
+            "".join(f"{value:>{width}}" for value, (_, width) in zip(row, columns))
+        )
+
+
+@click.command(cls=ConnectedProviderCommand)
+@click.argument("vaults", nargs=-1, required=True)
+@click.option("--ttl", default=CACHE_TTL, help="Seconds to reuse cached results.")
+@click.option("--refresh", is_flag=True, help="Ignore cached results.")
+@click.option("--json", "as_json", is_flag=True, help="Print raw JSON.")
+def cli(vaults, ttl, refresh, as_json):
+    routers = load_fleet(vaults, ttl=ttl, refresh=refresh)
+    if as_json:
+        click.echo(json.dumps(routers, indent=2))
+    else:
+        print_report(routers)
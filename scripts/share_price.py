@@ -0,0 +1,158 @@
+from dataclasses import dataclass
+
+from ape import chain
+
+# Precision of `profitUnlockingRate` in both V3 vaults and tokenized strategies.
+MAX_BPS_EXTENDED = 1_000_000_000_000
+
+
+@dataclass(frozen=True)
+class SharePriceModel:
+    """
+    Snapshot of a V3 vault's share accounting that can value shares at any
+    timestamp without an RPC call.
+
+    Between reports the only thing that moves the price per share is the
+    unlocking of locked profit shares, which happens linearly at
+    `profitUnlockingRate` until `fullProfitUnlockDate`. This mirrors the
+    integer math of `_unlocked_shares` / `_convert_to_assets` in the vault,
+    so results match `convertToAssets` at any block after the snapshot until
+    the next report, deposit or withdraw changes the vault's totals.
+    """
+
+    address: str
+    decimals: int
+    timestamp: int
+    total_assets: int
+    # Raw supply including shares that are still locked in the vault.
+    total_supply: int
+    # Shares held by the vault itself, i.e. profit still to be unlocked.
+    locked_shares: int
+    profit_unlocking_rate: int
+    full_profit_unlock_date: int
+    last_profit_update: int
+
+    @classmethod
+    def snapshot_calls(cls, v3_vault):
+        """`(method, *args)` reads `from_values` needs, e.g. for a multicall."""
+        # Tokenized strategies call it `lastReport`.
+        if hasattr(v3_vault, "lastProfitUpdate"):
+            last_profit_update = v3_vault.lastProfitUpdate
+        else:
+            last_profit_update = v3_vault.lastReport
+
+        return [
+            (v3_vault.decimals,),
+            (v3_vault.totalAssets,),
+            (v3_vault.totalSupply,),
+            (v3_vault.unlockedShares,),
+            (v3_vault.balanceOf, v3_vault.address),
+            (v3_vault.profitUnlockingRate,),
+            (v3_vault.fullProfitUnlockDate,),
+            (last_profit_update,),
+            (v3_vault.pricePerShare,),
+        ]
+
+    @classmethod
+    def from_values(cls, address, timestamp, values):
+        """Build a model from `snapshot_calls` results read at one block."""
+        (
+            decimals,
+            total_assets,
+            total_supply,
+            unlocked_shares,
+            own_balance,
+            profit_unlocking_rate,
+            full_profit_unlock_date,
+            last_profit_update,
+            price_per_share,
+        ) = values
+
+        # Both `totalSupply` and the vault's own `balanceOf` already have the
+        # shares unlocked since the last update subtracted.
+        model = cls(
+            address=address,
+            decimals=decimals,
+            timestamp=timestamp,
+            total_assets=total_assets,
+            total_supply=total_supply + unlocked_shares,
+            locked_shares=own_balance + unlocked_shares,
+            profit_unlocking_rate=profit_unlocking_rate,
+            full_profit_unlock_date=full_profit_unlock_date,
+            last_profit_update=last_profit_update,
+        )
+
+        if model.price_per_share() != price_per_share:
+            raise ValueError(
+                f"Share price model for {address} gives "
+                f"{model.price_per_share()} at {timestamp}, "
+                f"vault reports {price_per_share}"
+            )
+        return model
+
+    @classmethod
+    def from_vault(cls, v3_vault, block_id=None):
+        # Read everything at one block so a new block can't split the snapshot.
+        block = chain.blocks[-1 if block_id is None else block_id]
+        values = [
+            method(*args, block_id=block.number)
+            for method, *args in cls.snapshot_calls(v3_vault)
+        ]
+        return cls.from_values(v3_vault.address, block.timestamp, values)
+
+    def unlocked_shares(self, timestamp=None):
+        timestamp = self.timestamp if timestamp is None else timestamp
+        if self.full_profit_unlock_date > timestamp:
+            return (
+                self.profit_unlocking_rate
+                * (timestamp - self.last_profit_update)
+                // MAX_BPS_EXTENDED
+            )
+        elif self.full_profit_unlock_date != 0:
+            return self.locked_shares
+        return 0
+
+    def effective_supply(self, timestamp=None):
+        return self.total_supply - self.unlocked_shares(timestamp)
+
+    def convert_to_assets(self, shares, timestamp=None):
+        if shares == 0:
+            return 0
+        total_supply = self.effective_supply(timestamp)
+        if total_supply == 0:
+            return shares
+        return shares * self.total_assets // total_supply
+
+    def price_per_share(self, timestamp=None):
+        return self.convert_to_assets(10**self.decimals, timestamp)
+
+
+# One model per V3 vault, shared by every router that points at it.
+_models = {}
+
+
+def get_share_price_model(v3_vault, refresh=False):
+    address = v3_vault.address
+    if refresh or address not in _models:
+        _models[address] = SharePriceModel.from_vault(v3_vault)
+    return _models[address]
+
+
+def remember(model):
+    """Share a model built elsewhere, e.g. from a batched snapshot."""
+    _models[model.address] = model
+    return model
+
+
+def invalidate(v3_vault=None):
+    """Drop cached models, e.g. after a `StrategyReported` event."""
+    if v3_vault is None:
+        _models.clear()
+    else:
+        _models.pop(v3_vault.address, None)
+
+
+def balance_of_vault(router, v3_vault, timestamp=None):
+    """Off-chain equivalent of `V3Router.balanceOfVault()`."""
+    model = get_share_price_model(v3_vault)
+    return model.convert_to_assets(v3_vault.balanceOf(router), timestamp)
@@ -0,0 +1,160 @@
+import click
+import numpy as np
+
+MAX_BPS = 10_000
+
+
+def prepare_return(
+    total_debt,
+    idle_want,
+    v3_assets,
+    price_shock,
+    debt_ratio,
+    liquidity,
+    vault_idle=0,
+    max_loss=1,
+    withdraw_loss=0,
+):
+    """
+    Vectorised model of `V3Router.prepareReturn` for one harvest.
+
+    All arguments broadcast against each other:
+        total_debt: router debt in the V2 vault.
+        idle_want: `want` held by the router.
+        v3_assets: value of the router's V3 shares before the shock.
+        price_shock: fractional drop of the V3 price per share, 0.1 is -10%.
+        debt_ratio: V2 debt ratio of the router in bps at harvest time.
+        liquidity: fraction of the router's V3 shares within `maxRedeem`.
+        vault_idle: `want` sitting in the V2 vault.
+        max_loss: `V3Router.maxLoss` in bps.
+        withdraw_loss: fraction lost on `redeem` on top of the share price.
+
+    Amounts are floats, so results match the contract up to rounding.
+    """
+    (
+        total_debt,
+        idle_want,
+        v3_assets,
+        price_shock,
+        debt_ratio,
+        liquidity,
+        vault_idle,
+        max_loss,
+        withdraw_loss,
+    ) = np.broadcast_arrays(
+        *[
+            np.asarray(value, dtype=np.float64)
+            for value in (
+                total_debt,
+                idle_want,
+                v3_assets,
+                price_shock,
+                debt_ratio,
+                liquidity,
+                vault_idle,
+                max_loss,
+                withdraw_loss,
+            )
+        ]
+    )
+
+    v3_value = v3_assets * (1 - price_shock)
+    total_assets = idle_want + v3_value
+
+    # vault.debtOutstanding(strategy)
+    debt_limit = debt_ratio * (vault_idle + total_debt) / MAX_BPS
+    debt_outstanding = np.maximum(total_debt - debt_limit, 0)
+
+    profit = np.maximum(total_assets - total_debt, 0)
+    loss = np.maximum(total_debt - total_assets, 0)
+
+    # liquidatePosition(debtOutstanding + profit)
+    needed = debt_outstanding + profit
+    needed = np.where(
+        needed > idle_want,
+        np.minimum(needed, idle_want + v3_value * liquidity),
+        needed,
+    )
+    requested = np.minimum(np.maximum(needed - idle_want, 0), v3_value)
+    balance = idle_want + requested * (1 - withdraw_loss)
+    freed = np.minimum(needed, balance)
+    lost = np.maximum(needed - balance, 0)
+
+    has_loss = loss > 0
+    # `_profit` is zeroed before `_loss = _lost - _profit`, so the whole of
+    # `_lost` is reported instead of the part exceeding the profit.
+    lost_over_profit = ~has_loss & (lost > profit)
+    overstated_loss = np.where(lost_over_profit, profit, 0)
+
+    reported_profit = np.where(has_loss | lost_over_profit, 0, profit - lost)
+    debt_payment = np.where(has_loss | lost_over_profit, freed, debt_outstanding)
+
+    # `redeem` reverts if it would lose more than `maxLoss`, and the V2 vault
+    # reverts if the router does not hold `gain + debtPayment`, which happens
+    # when `maxRedeem` caps the amount freed while there is profit.
+    reverted = (requested > 0) & (withdraw_loss * MAX_BPS > max_loss)
+    reverted |= balance < (reported_profit + debt_payment) * (1 - 1e-12)
+
+    return {
+        "profit": reported_profit,
+        "loss": np.where(has_loss, loss + lost, np.where(lost_over_profit, lost, 0)),
+        "debt_payment": debt_payment,
+        "debt_outstanding": debt_outstanding,
+        "overstated_loss": overstated_loss,
+        "reverted": reverted,
+    }
+
+
+def stress_grid(price_shocks, debt_ratios, liquidities, **state):
+    """
+    Evaluate `prepare_return` on every combination of the given axes.
+
+    Returns the flattened axes and results in one dict, one entry per point.
+    """
+    shocks, ratios, liquidity = [
+        grid.ravel()
+        for grid in np.meshgrid(price_shocks, debt_ratios, liquidities, indexing="ij")
+    ]
+    results = prepare_return(
+        price_shock=shocks, debt_ratio=ratios, liquidity=liquidity, **state
+    )
+    return {
+        "price_shock": shocks,
+        "debt_ratio": ratios,
+        "liquidity": liquidity,
+        **results,
+    }
+
+
+@click.command()
+@click.option("--min-shock", default=-0.1, help="Smallest V3 price drop.")
+@click.option("--max-shock", default=0.5, help="Largest V3 price drop.")
+@click.option("--steps", default=51, help="Points per axis.")
+@click.option("--max-loss", default=1, help="V3Router.maxLoss in bps.")
+@click.option("--withdraw-loss", default=0.0, help="Extra loss on redeem.")
+def cli(min_shock, max_shock, steps, max_loss, withdraw_loss):
+    # Normalised to a router holding all its debt in the V3 vault.
+    results = stress_grid(
+        np.linspace(min_shock, max_shock, steps),
+        np.linspace(0, MAX_BPS, steps),
+        np.linspace(0, 1, steps),
+        total_debt=1,
+        idle_want=0,
+        v3_assets=1,
+        max_loss=max_loss,
+        withdraw_loss=withdraw_loss,
+    )
+
+    points = len(results["loss"])
+    worst = np.argmax(results["loss"])
+    click.echo(f"Evaluated {points} grid points")
+    click.echo(f"Harvests reverting: {results['reverted'].sum()}")
+    click.echo(
+        f"Harvests over-reporting loss: {(results['overstated_loss'] > 0).sum()}"
+    )
+    click.echo(
+        f"Worst reported loss: {results['loss'][worst]:.4f} of debt at "
+        f"shock={results['price_shock'][worst]:.3f}, "
+        f"debt_ratio={results['debt_ratio'][worst]:.0f}, "
+        f"liquidity={results['liquidity'][worst]:.2f}"
+    )
@@ -0,0 +1,196 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import List
+
+from ape import chain, convert
+from ape.logging import logger
+from web3.exceptions import TransactionNotFound, Web3Exception
+
+# Nodes require at least a 10% fee increase to replace a pending tx.
+FEE_BUMP = 1.125
+# Errors a replacement can hit when the original was mined in the meantime
+# or is still propagating; the nonce has landed or will, so keep polling.
+REPLACEMENT_ERRORS = (
+    "nonce too low",
+    "replacement transaction underpriced",
+    "already known",
+)
+
+
+@dataclass(eq=False)
+class PendingTransaction:
+    nonce: int
+    txn: object
+    sent_at: float
+    # Every hash sent for this nonce, the newest replacement last.
+    txn_hashes: List[str] = field(default_factory=list)
+    receipt: object = None
+
+
+class TransactionPipeline:
+    """
+    Sends transactions from one signer without waiting for each receipt.
+
+    Nonces are tracked locally so up to `max_in_flight` transactions can be
+    pending at once. Transactions that have not been mined after
+    `stuck_after` seconds are re-sent with the same nonce and bumped fees,
+    never above `max_fee_cap` (the `max_fee` or `gas_price` given, if any).
+
+        with TransactionPipeline(signer) as txs:
+            txs.transact(strategy.harvest)
+            txs.transact(strategy.setMaxLoss, 10)
+
+        receipts = txs.receipts
+
+    Gas is estimated against the latest block, so a transaction that relies
+    on an earlier queued one (e.g. a deposit after its approval) needs an
+    explicit `gas_limit`. Receipts are returned as mined; check
+    `receipt.failed` before relying on their effects.
+    """
+
+    def __init__(
+        self,
+        signer,
+        max_in_flight=8,
+        stuck_after=120,
+        poll_interval=1,
+        fee_bump=FEE_BUMP,
+        max_fee_cap=None,
+        **txn_kwargs,
+    ):
+        self.signer = signer
+        self.max_in_flight = max_in_flight
+        self.stuck_after = stuck_after
+        self.poll_interval = poll_interval
+        self.fee_bump = fee_bump
+        # Defaults for every transaction, e.g. `max_fee` or `max_priority_fee`.
+        self.txn_kwargs = txn_kwargs
+        if max_fee_cap is None:
+            max_fee_cap = txn_kwargs.get("max_fee", txn_kwargs.get("gas_price"))
+        self.max_fee_cap = None if max_fee_cap is None else convert(max_fee_cap, int)
+
+        self.web3 = chain.provider.web3
+        self.nonce = self.web3.eth.get_transaction_count(signer.address, "pending")
+        self.pending = []
+        self.receipts = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *args):
+        if exc_type is None:
+            self.wait()
+
+    def transact(self, method, *args, **kwargs):
+        """Queue a call to a contract method, e.g. `strategy.harvest`."""
+        txn = method.as_transaction(
+            *args, sender=self.signer, **{**self.txn_kwargs, **kwargs}
+        )
+        return self.submit(txn)
+
+    def deploy(self, contract_type, *args, **kwargs):
+        """Queue a deployment of a contract container, e.g. `project.V3Router`."""
+        txn = contract_type.constructor.serialize_transaction(
+            *args, sender=self.signer, **{**self.txn_kwargs, **kwargs}
+        )
+        return self.submit(txn)
+
+    def submit(self, txn):
+        if len(self.pending) >= self.max_in_flight:
+            self._wait_for(self.pending[0])
+
+        txn.nonce = self.nonce
+        # Fills in gas limit, fees and chain id like `AccountAPI.call` does.
+        txn = chain.provider.prepare_transaction(txn)
+
+        pending = PendingTransaction(nonce=txn.nonce, txn=txn, sent_at=time.time())
+        try:
+            self._send(pending)
+        except Exception:
+            # Nothing landed at this nonce, so resync rather than leave a gap
+            # that every later transaction would queue behind.
+            self.nonce = self.web3.eth.get_transaction_count(
+                self.signer.address, "pending"
+            )
+            raise
+
+        self.nonce += 1
+        self.pending.append(pending)
+        return pending
+
+    def bump(self, pending):
+        """
+        Replace a pending transaction with one paying higher fees.
+
+        Returns False without re-sending once fees are at `max_fee_cap`.
+        """
+        txn = pending.txn
+        pending.sent_at = time.time()
+        fee = txn.max_fee if txn.type == 2 else txn.gas_price
+        if self.max_fee_cap is not None and fee >= self.max_fee_cap:
+            logger.warning(
+                f"Nonce {pending.nonce} is stuck at the fee cap of "
+                f"{self.max_fee_cap} wei, not bumping."
+            )
+            return False
+
+        if txn.type == 2:
+            txn.max_fee = self._bumped(txn.max_fee)
+            # The tip can never be above the max fee.
+            txn.max_priority_fee = min(self._bumped(txn.max_priority_fee), txn.max_fee)
+        else:
+            txn.gas_price = self._bumped(txn.gas_price)
+
+        txn.signature = None
+        try:
+            self._send(pending)
+        except (ValueError, Web3Exception) as error:
+            if not any(reason in str(error).lower() for reason in REPLACEMENT_ERRORS):
+                raise
+        return True
+
+    def wait(self):
+        """Block until every queued transaction has a receipt."""
+        if self.pending:
+            self._wait_for(self.pending[-1])
+        return self.receipts
+
+    def _bumped(self, fee):
+        # A zero fee still has to go up for the node to accept the replacement.
+        fee = max(int(fee * self.fee_bump), fee + 1)
+        if self.max_fee_cap is not None:
+            fee = min(fee, self.max_fee_cap)
+        return fee
+
+    def _send(self, pending):
+        # Any of the sent hashes may still be mined, so keep them all.
+        signed = self.signer.sign_transaction(pending.txn)
+        txn_hash = self.web3.eth.send_raw_transaction(signed.serialize_transaction())
+        pending.txn_hashes.append(self.web3.to_hex(txn_hash))
+
+    def _fetch_receipt(self, pending):
+        for txn_hash in reversed(pending.txn_hashes):
+            try:
+                self.web3.eth.get_transaction_receipt(txn_hash)
+            except TransactionNotFound:
+                continue
+            return chain.provider.get_receipt(txn_hash)
+
+    def _wait_for(self, target):
+        """Poll receipts concurrently until `target` and all lower nonces land."""
+        with ThreadPoolExecutor(max_workers=self.max_in_flight) as executor:
+            while target in self.pending:
+                receipts = executor.map(self._fetch_receipt, list(self.pending))
+                for pending, receipt in zip(list(self.pending), receipts):
+                    if receipt is not None:
+                        pending.receipt = receipt
+                    elif time.time() - pending.sent_at > self.stuck_after:
+                        self.bump(pending)
+
+                # Receipts are only final once every lower nonce is mined.
+                while self.pending and self.pending[0].receipt is not None:
+                    self.receipts.append(self.pending.pop(0).receipt)
+
+                if target in self.pending:
+                    time.sleep(self.poll_interval)
@@ -0,0 +1,134 @@
+import json
+from types import SimpleNamespace
+
+import click
+import pytest
+
+from scripts import compile_report
+from scripts.compile_report import (
+    CONTRACT_SIZE_LIMIT,
+    REPORT_VERSION,
+    compile_changed,
+    load_report,
+    print_report,
+)
+
+
+@pytest.fixture
+def fake_project(tmp_path, monkeypatch):
+    """A contracts folder shaped like this repo with a recording compiler."""
+    contracts = tmp_path / "contracts"
+    (contracts / "interfaces").mkdir(parents=True)
+    (contracts / "interfaces" / "IVault.sol").write_text("interface IVault {}")
+    (contracts / "V3Router.sol").write_text(
+        'import {IVault} from "./interfaces/IVault.sol";\ncontract V3Router {}'
+    )
+    (contracts / "MockV3Strategy.sol").write_text("contract MockV3Strategy {}")
+    config = tmp_path / "ape-config.yaml"
+    config.write_text("solidity:\n  version: 0.8.18\n")
+
+    compiled = []
+
+    def load_contracts(source, use_cache=True):
+        compiled.append(source.relative_to(contracts).as_posix())
+        contract_type = SimpleNamespace(
+            name=source.stem,
+            source_id=source.relative_to(contracts).as_posix(),
+            runtime_bytecode=SimpleNamespace(bytecode="0x" + "00" * 100),
+            deployment_bytecode=SimpleNamespace(bytecode="0x" + "00" * 120),
+        )
+        return {source.stem: SimpleNamespace(contract_type=contract_type)}
+
+    monkeypatch.setattr(
+        compile_report,
+        "project",
+        SimpleNamespace(
+            path=tmp_path, contracts_folder=contracts, load_contracts=load_contracts
+        ),
+    )
+    monkeypatch.setattr(compile_report, "CONFIG_PATH", config)
+    monkeypatch.setattr(compile_report, "REPORT_PATH", tmp_path / "report.json")
+    yield SimpleNamespace(contracts=contracts, config=config, compiled=compiled)
+
+
+def test_compiles_everything_first(fake_project):
+    report = load_report()
+    contracts = compile_changed(report)
+
+    assert sorted(fake_project.compiled) == [
+        "MockV3Strategy.sol",
+        "V3Router.sol",
+        "interfaces/IVault.sol",
+    ]
+    assert contracts["V3Router"]["size"] == 100
+    assert contracts["V3Router"]["initcode_size"] == 120
+
+
+def test_skips_unchanged_sources(fake_project):
+    report = load_report()
+    first = compile_changed(report)
+    fake_project.compiled.clear()
+
+    assert compile_changed(report) == first
+    assert fake_project.compiled == []
+
+
+def test_import_change_recompiles_importer(fake_project):
+    report = load_report()
+    compile_changed(report)
+    fake_project.compiled.clear()
+
+    (fake_project.contracts / "interfaces" / "IVault.sol").write_text(
+        "interface IVault { function asset() external view returns (address); }"
+    )
+    compile_changed(report)
+
+    assert sorted(fake_project.compiled) == ["V3Router.sol", "interfaces/IVault.sol"]
+
+
+def test_config_change_recompiles_everything(fake_project):
+    report = load_report()
+    compile_changed(report)
+    fake_project.compiled.clear()
+
+    fake_project.config.write_text("solidity:\n  version: 0.8.19\n")
+    compile_changed(report)
+
+    assert len(fake_project.compiled) == 3
+
+
+def test_force_recompiles_everything(fake_project):
+    report = load_report()
+    compile_changed(report)
+    fake_project.compiled.clear()
+
+    compile_changed(report, force=True)
+    assert len(fake_project.compiled) == 3
+
+
+def test_old_report_version_is_discarded(fake_project):
+    compile_report.REPORT_PATH.write_text(
+        json.dumps(
+            {"version": REPORT_VERSION - 1, "sources": {"x": {}}, "history": [{}]}
+        )
+    )
+    assert load_report() == {"version": REPORT_VERSION, "sources": {}, "history": []}
+
+    current = {"version": REPORT_VERSION, "sources": {}, "history": [{"a": 1}]}
+    compile_report.REPORT_PATH.write_text(json.dumps(current))
+    assert load_report() == current
+
+
+def test_over_size_limit_raises():
+    contracts = {
+        "V3Router": {
+            "size": CONTRACT_SIZE_LIMIT + 1,
+            "initcode_size": CONTRACT_SIZE_LIMIT + 100,
+            "source_compile_time": 1.0,
+        }
+    }
+    with pytest.raises(click.ClickException):
+        print_report(contracts, {})
+
+    contracts["V3Router"]["size"] = CONTRACT_SIZE_LIMIT
+    print_report(contracts, {})
@@ -0,0 +1,59 @@
+import pytest
+
+from scripts import health_report
+from scripts.health_report import fetch_fleet, load_fleet
+
+
+def test_fetch_fleet(
+    chain, token, vault, strategy, v3_vault, user, amount, keeper, RELATIVE_APPROX
+):
+    token.approve(vault.address, amount, sender=user)
+    vault.deposit(amount, sender=user)
+    chain.mine(1)
+    strategy.harvest(sender=keeper)
+    chain.mine(1, timestamp=chain.pending_timestamp + 3600)
+
+    (info,) = fetch_fleet([vault.address])
+
+    assert info["router"] == strategy.address
+    assert info["v3_vault"] == v3_vault.address
+    assert info["debt"] == amount
+    assert pytest.approx(info["estimated_total_assets"], rel=RELATIVE_APPROX) == amount
+    assert info["idle_want"] == 0
+    assert info["max_redeem"] == strategy.balanceOfVault()
+    assert info["max_loss"] == strategy.maxLoss()
+    assert info["last_harvest_age"] >= 3600
+
+
+def test_load_fleet_uses_cache(
+    tmp_path, monkeypatch, chain, token, vault, strategy, user, amount, keeper
+):
+    monkeypatch.setattr(health_report, "CACHE_PATH", tmp_path)
+
+    first = load_fleet([vault.address])
+    assert first[0]["debt"] == 0
+
+    token.approve(vault.address, amount, sender=user)
+    vault.deposit(amount, sender=user)
+    chain.mine(1)
+    strategy.harvest(sender=keeper)
+
+    # Cached results are returned until the TTL runs out.
+    assert load_fleet([vault.address]) == first
+    assert load_fleet([vault.address], refresh=True)[0]["debt"] == amount
+    assert load_fleet([vault.address], ttl=0)[0]["debt"] == amount
+
+
+def test_fetch_fleet_without_multicall(
+    monkeypatch, chain, token, vault, strategy, user, amount, keeper
+):
+    token.approve(vault.address, amount, sender=user)
+    vault.deposit(amount, sender=user)
+    chain.mine(1)
+    strategy.harvest(sender=keeper)
+    chain.mine(1, timestamp=chain.pending_timestamp + 3600)
+
+    batched = fetch_fleet([vault.address])
+    # Networks without Multicall3 fall back to plain calls at the same block.
+    monkeypatch.setattr(health_report, "_has_multicall", lambda: False)
+    assert fetch_fleet([vault.address]) == batched
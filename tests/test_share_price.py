@@ -0,0 +1,69 @@
+from ape import project
+
+from scripts.share_price import (
+    balance_of_vault,
+    get_share_price_model,
+    invalidate,
+)
+from utils.constants import DAY
+
+
+def test_share_price_model_matches_chain(
+    chain,
+    token,
+    vault,
+    strategy,
+    v3_strategy,
+    user,
+    strategist,
+    whale,
+    amount,
+    keeper,
+    gov,
+):
+    vault.updateStrategyDebtRatio(strategy, 0, sender=gov)
+    strategy = strategist.deploy(project.V3Router, vault, v3_strategy, "test strategy")
+    strategy.setKeeper(keeper, sender=strategist)
+    vault.addStrategy(strategy, 10_000, 0, 2**256 - 1, 0, sender=gov)
+
+    token.approve(vault.address, amount, sender=user)
+    vault.deposit(amount, sender=user)
+    chain.mine(1)
+    strategy.harvest(sender=keeper)
+
+    # Simulate a profitable report on the V3 side so profit starts unlocking.
+    token.transfer(v3_strategy, amount // 100, sender=whale)
+    v3_strategy.report(sender=strategist)
+    shares = v3_strategy.balanceOf(strategy)
+    reported_at = chain.blocks.head.timestamp
+    full_profit_unlock_date = v3_strategy.fullProfitUnlockDate()
+
+    # Snapshot at the report, partway through the unlock and after it ends.
+    for snapshot_at in [reported_at, reported_at + 3 * DAY, full_profit_unlock_date]:
+        if snapshot_at > chain.blocks.head.timestamp:
+            chain.mine(1, timestamp=snapshot_at + 1)
+
+        model = get_share_price_model(v3_strategy, refresh=True)
+
+        for _ in range(3):
+            timestamp = chain.blocks.head.timestamp
+            assert model.convert_to_assets(shares, timestamp) == (
+                v3_strategy.convertToAssets(shares)
+            )
+            assert model.price_per_share(timestamp) == v3_strategy.pricePerShare()
+            chain.mine(1, timestamp=timestamp + DAY)
+
+    timestamp = chain.blocks.head.timestamp
+    assert (
+        balance_of_vault(strategy, v3_strategy, timestamp) == strategy.balanceOfVault()
+    )
+    invalidate()
+
+
+def test_share_price_model_is_shared(strategist, vault, v3_vault, strategy):
+    invalidate()
+    other = strategist.deploy(project.V3Router, vault, v3_vault, "other strategy")
+
+    model = get_share_price_model(project.IVault.at(strategy.v3Vault()))
+    assert get_share_price_model(project.IVault.at(other.v3Vault())) is model
+    assert get_share_price_model(v3_vault, refresh=True) is not model
@@ -0,0 +1,229 @@
+import ape
+from ape import project
+import pytest
+
+from scripts.stress_loss import prepare_return, stress_grid
+from utils.constants import MAX_INT
+
+# (price_shock, debt_ratio, liquidity, withdraw_loss_bps, max_loss) points run
+# against the real contract. A negative shock is a gain in the V3 vault.
+SAMPLES = [
+    (0.0, 5_000, 1.0, 0, 1),
+    (0.1, 10_000, 1.0, 0, 1),
+    (0.1, 5_000, 0.25, 0, 1),
+    (0.0, 0, 1.0, 0, 1),
+    # Profit plus a loss on redeem hits the `_loss = _lost - _profit` branch.
+    (-0.1, 5_000, 1.0, 5_000, 10_000),
+]
+
+REVERTING_SAMPLES = [
+    # Profit-less harvest that can't free all the debt outstanding fails the
+    # V2 vault's `gain + debtPayment` balance check.
+    (0.0, 0, 0.5, 0, 1),
+    # Redeem losing more than `maxLoss`.
+    (0.0, 5_000, 1.0, 50, 1),
+]
+
+
+def test_stress_grid_shape():
+    results = stress_grid(
+        [0, 0.1, 0.2],
+        [0, 5_000],
+        [0.5, 1],
+        total_debt=100,
+        idle_want=0,
+        v3_assets=100,
+    )
+
+    assert results["loss"].shape == (12,)
+    assert (results["loss"][results["price_shock"] == 0] == 0).all()
+    assert (results["loss"] >= results["price_shock"] * 100).all()
+
+
+def test_overstated_loss():
+    # 10 profit, 60 requested of which half is lost on redeem.
+    results = prepare_return(
+        total_debt=100,
+        idle_want=0,
+        v3_assets=110,
+        price_shock=0,
+        debt_ratio=5_000,
+        liquidity=1,
+        max_loss=10_000,
+        withdraw_loss=0.5,
+    )
+
+    assert not results["reverted"]
+    assert results["profit"] == 0
+    assert results["loss"] == 30
+    assert results["overstated_loss"] == 10
+    assert results["debt_payment"] == 30
+
+
+def _shock_router(
+    chain,
+    token,
+    vault,
+    strategy,
+    v3_strategy,
+    user,
+    strategist,
+    whale,
+    amount,
+    keeper,
+    gov,
+    price_shock,
+    debt_ratio,
+    liquidity,
+    withdraw_loss,
+    max_loss,
+):
+    """
+    Put a fresh router on `v3_strategy`, apply the sample on chain and
+    return the router with the model's prediction for its next harvest.
+    """
+    vault.updateStrategyDebtRatio(strategy, 0, sender=gov)
+    strategy = strategist.deploy(project.V3Router, vault, v3_strategy, "test strategy")
+    strategy.setKeeper(keeper, sender=strategist)
+    strategy.setMaxLoss(max_loss, sender=gov)
+    vault.addStrategy(strategy, 10_000, 0, MAX_INT, 0, sender=gov)
+
+    token.approve(vault.address, amount, sender=user)
+    vault.deposit(amount, sender=user)
+    chain.mine(1)
+    strategy.harvest(sender=keeper)
+
+    total_debt = vault.strategies(strategy).totalDebt
+    v3_assets = strategy.balanceOfVault()
+
+    if price_shock > 0:
+        v3_strategy.setLoss(int(v3_assets * price_shock), sender=strategist)
+        v3_strategy.report(sender=strategist)
+    elif price_shock < 0:
+        # Straight to the deployed funds so every withdraw goes through
+        # `_freeFunds` and its loss.
+        token.transfer(
+            v3_strategy.yieldSource(), int(v3_assets * -price_shock), sender=whale
+        )
+        v3_strategy.report(sender=strategist)
+        chain.mine(1, timestamp=v3_strategy.fullProfitUnlockDate() + 1)
+
+    v3_strategy.setWithdrawable(
+        int(strategy.balanceOfVault() * liquidity), sender=strategist
+    )
+    v3_strategy.setWithdrawLoss(withdraw_loss, sender=strategist)
+    vault.updateStrategyDebtRatio(strategy, debt_ratio, sender=gov)
+    strategy.setDoHealthCheck(False, sender=gov)
+
+    expected = stress_grid(
+        # Fees on V3 profit make the realised shock differ from the sample.
+        [1 - strategy.balanceOfVault() / v3_assets],
+        [debt_ratio],
+        [liquidity],
+        total_debt=total_debt,
+        idle_want=strategy.balanceOfWant(),
+        v3_assets=v3_assets,
+        vault_idle=token.balanceOf(vault),
+        max_loss=strategy.maxLoss(),
+        withdraw_loss=withdraw_loss / 10_000,
+    )
+    return strategy, {key: value[0] for key, value in expected.items()}
+
+
+@pytest.mark.parametrize(
+    "price_shock,debt_ratio,liquidity,withdraw_loss,max_loss", SAMPLES
+)
+def test_stress_model_matches_chain(
+    chain,
+    token,
+    vault,
+    strategy,
+    v3_strategy,
+    user,
+    strategist,
+    whale,
+    amount,
+    keeper,
+    gov,
+    price_shock,
+    debt_ratio,
+    liquidity,
+    withdraw_loss,
+    max_loss,
+):
+    strategy, expected = _shock_router(
+        chain,
+        token,
+        vault,
+        strategy,
+        v3_strategy,
+        user,
+        strategist,
+        whale,
+        amount,
+        keeper,
+        gov,
+        price_shock,
+        debt_ratio,
+        liquidity,
+        withdraw_loss,
+        max_loss,
+    )
+    assert not expected["reverted"]
+
+    tx = strategy.harvest(sender=keeper)
+    harvested = list(tx.decode_logs(strategy.Harvested))[0]
+
+    tolerance = amount * 1e-6
+    assert pytest.approx(expected["profit"], abs=tolerance) == harvested.profit
+    assert pytest.approx(expected["loss"], abs=tolerance) == harvested.loss
+    assert (
+        pytest.approx(expected["debt_payment"], abs=tolerance) == harvested.debtPayment
+    )
+    if withdraw_loss and price_shock < 0:
+        assert expected["overstated_loss"] > tolerance
+
+
+@pytest.mark.parametrize(
+    "price_shock,debt_ratio,liquidity,withdraw_loss,max_loss", REVERTING_SAMPLES
+)
+def test_stress_model_predicts_revert(
+    chain,
+    token,
+    vault,
+    strategy,
+    v3_strategy,
+    user,
+    strategist,
+    whale,
+    amount,
+    keeper,
+    gov,
+    price_shock,
+    debt_ratio,
+    liquidity,
+    withdraw_loss,
+    max_loss,
+):
+    strategy, expected = _shock_router(
+        chain,
+        token,
+        vault,
+        strategy,
+        v3_strategy,
+        user,
+        strategist,
+        whale,
+        amount,
+        keeper,
+        gov,
+        price_shock,
+        debt_ratio,
+        liquidity,
+        withdraw_loss,
+        max_loss,
+    )
+    assert expected["reverted"]
+
+    with ape.reverts():
+        strategy.harvest(sender=keeper)
@@ -0,0 +1,133 @@
+import threading
+
+from ape import project
+import pytest
+
+from scripts.transactions import TransactionPipeline
+
+
+@pytest.fixture
+def no_automine(chain):
+    chain.provider.make_request("evm_setAutomine", [False])
+    yield
+    chain.provider.make_request("evm_setAutomine", [True])
+
+
+def test_pipeline_batches_into_one_block(
+    chain, token, vault, user, amount, no_automine
+):
+    start_nonce = user.nonce
+
+    txs = TransactionPipeline(user, poll_interval=0)
+    for _ in range(4):
+        txs.transact(token.approve, vault, amount)
+    # Can't be estimated until the approvals are mined.
+    txs.transact(vault.deposit, amount, gas_limit=500_000)
+
+    # Nothing is mined until we mine a block.
+    assert [pending.nonce for pending in txs.pending] == list(
+        range(start_nonce, start_nonce + 5)
+    )
+    assert vault.balanceOf(user) == 0
+
+    chain.mine(1)
+    receipts = txs.wait()
+
+    assert len(receipts) == 5
+    assert not any(receipt.failed for receipt in receipts)
+    assert len({receipt.block_number for receipt in receipts}) == 1
+    assert vault.balanceOf(user) == amount
+
+
+def test_pipeline_bumps_stuck_transaction(chain, token, vault, user, no_automine):
+    txs = TransactionPipeline(user, poll_interval=0, stuck_after=0)
+    pending = txs.transact(token.approve, vault, 1)
+    fee = pending.txn.max_fee
+
+    txs.bump(pending)
+    assert pending.txn.max_fee > fee
+    assert len(pending.txn_hashes) == 2
+
+    chain.mine(1)
+    (receipt,) = txs.wait()
+    assert receipt.txn_hash == pending.txn_hashes[-1]
+    assert token.allowance(user, vault) == 1
+
+
+def test_pipeline_deploys(chain, vault, v3_vault, strategist, no_automine):
+    with TransactionPipeline(strategist, poll_interval=0) as txs:
+        txs.deploy(project.V3Router, vault, v3_vault, "pipelined router")
+        txs.deploy(project.V3Router, vault, v3_vault, "second router")
+        chain.mine(1)
+
+    assert len(txs.receipts) == 2
+    for receipt in txs.receipts:
+        assert not receipt.failed
+        router = project.V3Router.at(receipt.contract_address)
+        assert router.v3Vault() == v3_vault.address
+        assert router.vault() == vault.address
+
+
+def test_pipeline_bumps_in_wait(chain, token, vault, user, no_automine):
+    txs = TransactionPipeline(user, poll_interval=0.1, stuck_after=0)
+    pending = txs.transact(token.approve, vault, 1)
+
+    # Leave it stuck for a few polls before a block is mined.
+    timer = threading.Timer(1, chain.mine)
+    timer.start()
+    (receipt,) = txs.wait()
+    timer.join()
+
+    assert len(pending.txn_hashes) > 1
+    assert receipt.txn_hash in pending.txn_hashes
+    assert token.allowance(user, vault) == 1
+
+
+def test_pipeline_stops_bumping_at_cap(token, vault, user, no_automine):
+    txs = TransactionPipeline(user, poll_interval=0, stuck_after=0)
+    pending = txs.transact(token.approve, vault, 1)
+    txs.max_fee_cap = pending.txn.max_fee * 2
+
+    bumps = 0
+    while txs.bump(pending):
+        bumps += 1
+
+    assert bumps > 0
+    assert pending.txn.max_fee == txs.max_fee_cap
+    assert pending.txn.max_priority_fee <= pending.txn.max_fee
+    # The last, clamped bump may be too small for the node to accept.
+    assert len(pending.txn_hashes) >= bumps
+
+
+def test_pipeline_cap_defaults_to_max_fee(user):
+    txs = TransactionPipeline(user, max_fee="15 gwei")
+    assert txs.max_fee_cap == 15 * 10**9
+
+
+def test_pipeline_recovers_from_failed_send(
+    chain, token, vault, user, monkeypatch, no_automine
+):
+    txs = TransactionPipeline(user, poll_interval=0)
+    start_nonce = txs.nonce
+
+    send_raw_transaction = txs.web3.eth.send_raw_transaction
+
+    def fail_once(raw_transaction):
+        monkeypatch.setattr(txs.web3.eth, "send_raw_transaction", send_raw_transaction)
+        raise ValueError("insufficient funds for gas * price + value")
+
+    monkeypatch.setattr(txs.web3.eth, "send_raw_transaction", fail_once)
+    with pytest.raises(ValueError):
+        txs.transact(token.approve, vault, 1)
+
+    # The failed send must not leave a nonce gap.
+    assert txs.nonce == start_nonce
+    assert not txs.pending
+
+    pending = txs.transact(token.approve, vault, 2)
+    assert pending.nonce == start_nonce
+
+    chain.mine(1)
+    (receipt,) = txs.wait()
+    assert not receipt.failed
+    assert token.allowance(user, vault) == 2